@@ -1,13 +1,49 @@
 #!/usr/bin/env python3
 import argparse
-import json
-from .task_manager import TaskManager
+import functools
+import sys
+from .json_utils import dumps_bytes
 
 
-def main():
-    """
-    Command-line interface for the task management system.
-    """
+def _print_json(data) -> None:
+    """Write data as indented JSON, straight to stdout's byte stream when it has one."""
+    payload = dumps_bytes(data, indent=True) + b"\n"
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        # Text-only stdout, e.g. io.StringIO under contextlib.redirect_stdout
+        sys.stdout.write(payload.decode("utf-8"))
+        return
+    # Flush pending text output first so ordering with print() is preserved
+    sys.stdout.flush()
+    buffer.write(payload)
+    buffer.flush()
+
+
+def _add(task_manager, args) -> None:
+    """Process user input and update task tree."""
+    updated_tree = task_manager.process_user_input(args.task_description)
+    print("Task added successfully!")
+    print("Updated task tree:")
+    _print_json(updated_tree)
+
+
+def _show(task_manager, args) -> None:
+    """Show current task tree."""
+    task_tree = task_manager.get_task_tree()
+    _print_json(task_tree)
+
+
+def _reset(task_manager, args) -> None:
+    """Reset task tree."""
+    reset_tree = task_manager.reset_task_tree()
+    print("Task tree reset successfully!")
+    print("Initial task tree:")
+    _print_json(reset_tree)
+
+
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser once; repeated main() calls reuse it."""
     parser = argparse.ArgumentParser(description="CortexPropel Task Management System")
     
     # Define commands
@@ -16,42 +52,39 @@ def main():
     # Add task command
     add_parser = subparsers.add_parser("add", help="Add a new task")
     add_parser.add_argument("task_description", type=str, help="The task description")
+    add_parser.set_defaults(handler=_add)
     
     # Show task tree command
     show_parser = subparsers.add_parser("show", help="Show the current task tree")
+    show_parser.set_defaults(handler=_show)
     
     # Reset task tree command
     reset_parser = subparsers.add_parser("reset", help="Reset the task tree to its initial state")
+    reset_parser.set_defaults(handler=_reset)
+    
+    return parser
+
+
+def main():
+    """
+    Command-line interface for the task management system.
+    """
+    parser = _build_parser()
     
     # Process command-line arguments
     args = parser.parse_args()
     
-    # Initialize task manager
-    task_manager = TaskManager()
-    
-    # Execute command
-    if args.command == "add":
-        # Process user input and update task tree
-        updated_tree = task_manager.process_user_input(args.task_description)
-        print("Task added successfully!")
-        print("Updated task tree:")
-        print(json.dumps(updated_tree, ensure_ascii=False, indent=2))
-    
-    elif args.command == "show":
-        # Show current task tree
-        task_tree = task_manager.get_task_tree()
-        print(json.dumps(task_tree, ensure_ascii=False, indent=2))
-    
-    elif args.command == "reset":
-        # Reset task tree
-        reset_tree = task_manager.reset_task_tree()
-        print("Task tree reset successfully!")
-        print("Initial task tree:")
-        print(json.dumps(reset_tree, ensure_ascii=False, indent=2))
-    
-    else:
+    handler = getattr(args, "handler", None)
+    if handler is None:
         # Print help if no command is provided
         parser.print_help()
+        return
+    
+    # Imported lazily so --help and bare invocations skip loading the LLM stack
+    from .task_manager import TaskManager
+    
+    # Initialize task manager and execute command
+    handler(TaskManager(), args)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,63 @@
 import os
+import string
 from pathlib import Path
+from typing import Tuple
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+
+def _split_template(template: str, fields: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Split a str.format-style template into the literal chunks around its fields.
+    
+    Escaped braces are resolved here, once, so filling the template is a plain
+    concatenation of chunks and values.
+    
+    Args:
+        template: The template text
+        fields: The placeholder names, in the order they appear
+        
+    Returns:
+        len(fields) + 1 literal chunks
+    """
+    chunks = []
+    found = []
+    literal = ""
+    for text, field, _, _ in string.Formatter().parse(template):
+        literal += text
+        if field is not None:
+            found.append(field)
+            chunks.append(literal)
+            literal = ""
+    chunks.append(literal)
+    if tuple(found) != fields:
+        raise ValueError(f"Template fields {found} do not match {list(fields)}")
+    return tuple(chunks)
+
+
+def _env_int(name: str, default: int) -> int:
+    """
+    Read an integer setting from the environment.
+    
+    Args:
+        name: The environment variable
+        default: Value used when the variable is unset or not an integer
+        
+    Returns:
+        The parsed value
+    """
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Ignoring {name}={value!r}: expected an integer, using {default}")
+        return default
+
+
 class Config:
     # Model Configuration
     MODEL_NAME = os.getenv("MODEL_NAME", "bytedance_model")
@@ -15,21 +68,21 @@ class Config:
     # Use absolute path to ensure we always use the project root data folder
     _PROJECT_ROOT = Path(__file__).parent.parent
     TASK_TREE_FILE = str(_PROJECT_ROOT / "data" / "task_tree.json")
+    # Analysis reports persisted across runs, one file per distinct prompt
+    ANALYSIS_CACHE_DIR = str(_PROJECT_ROOT / "data" / "cache" / "analysis")
+    # Most recently used reports kept on disk; 0 disables the disk cache
+    ANALYSIS_CACHE_MAX_ENTRIES = _env_int("ANALYSIS_CACHE_MAX_ENTRIES", 256)
     
     # LLM Configuration
     TEMPERATURE = 0.1
     MAX_TOKENS = 65536
     
     # Prompt Templates
+    # The variable parts come last so the long static instructions form a stable
+    # prefix that providers can serve from their prompt cache
     TASK_PROMPT_TEMPLATE = """
     You are a smart personal assistant that helps users manage tasks, record information, track progress, and analyze data.
     
-    Current Task Tree:
-    {current_task_tree}
-    
-    User's Request:
-    {user_input}
-    
     Your Role:
     You help users with:
     1. **Task Management**: Create, update, and organize tasks and subtasks
@@ -98,7 +151,68 @@ class Config:
     - Always include a helpful message in Chinese
     - For query operations, include target_id to specify which task/project to analyze
     - Be smart about matching task names to find the right target_id
+    
+    Current Task Tree:
+    {current_task_tree}
+    
+    User's Request:
+    {user_input}
     """
+    _TASK_PROMPT_CHUNKS = _split_template(TASK_PROMPT_TEMPLATE, ("current_task_tree", "user_input"))
+    
+    def render_task_prompt(self, current_task_tree: str, user_input: str) -> str:
+        """
+        Fill TASK_PROMPT_TEMPLATE without re-parsing it on every call.
+        
+        Args:
+            current_task_tree: The serialized task tree
+            user_input: The user's request
+            
+        Returns:
+            The complete prompt text
+        """
+        head, middle, tail = self._TASK_PROMPT_CHUNKS
+        return f"{head}{current_task_tree}{middle}{user_input}{tail}"
+    
+    # Same layout as TASK_PROMPT_TEMPLATE: static instructions first, data last
+    ANALYSIS_PROMPT_TEMPLATE = """
+    你是一个数据分析助手。请根据下面给出的任务/记录数据，生成分析报告。
+    
+    要求:
+    1. 使用中文回复
+    2. 输出格式为 Markdown
+    3. 根据分析类型生成相应内容:
+       - list: 生成清晰的列表，按时间排序
+       - analyze: 分析数据趋势、变化规律
+       - summary: 生成汇总报告，包括统计信息
+    4. 如果数据包含数值（如体重、金额），尝试分析变化趋势
+    5. 如果有时间信息，按时间顺序整理
+    6. 保持简洁，重点突出
+    
+    直接输出 Markdown 内容，不要包含额外说明。
+    
+    数据:
+    {tasks_json}
+    
+    用户请求: {query_request}
+    分析类型: {query_type}
+    """
+    _ANALYSIS_PROMPT_CHUNKS = _split_template(ANALYSIS_PROMPT_TEMPLATE, ("tasks_json", "query_request", "query_type"))
+    
+    def render_analysis_prompt(self, tasks_json: str, query_request: str, query_type: str) -> str:
+        """
+        Fill ANALYSIS_PROMPT_TEMPLATE from its pre-split chunks.
+        
+        Args:
+            tasks_json: The serialized task data
+            query_request: What the user wants to know
+            query_type: Type of analysis (list/analyze/summary)
+            
+        Returns:
+            The complete prompt text
+        """
+        head, after_data, after_request, tail = self._ANALYSIS_PROMPT_CHUNKS
+        return f"{head}{tasks_json}{after_data}{query_request}{after_request}{query_type}{tail}"
 
 # Create a global config instance
 config = Config()
@@ -7,23 +7,55 @@ from pathlib import Path
 # Handle imports for both package and standalone execution
 try:
     from .config import config
+    from .json_utils import loads
 except ImportError:
     # Standalone execution
     from config import config
+    from json_utils import loads
+
+
+# Columns stored as JSON-encoded lists
+_JSON_LIST_FIELDS = frozenset(('tags', 'dependencies'))
+
+# Columns update_task_field may set; checked before the name is put into SQL
+_UPDATABLE_FIELDS = frozenset((
+    'title', 'description', 'status', 'priority',
+    'planned_start_time', 'planned_end_time', 'actual_start_time', 'actual_end_time',
+    'assigned_to', 'created_by', 'tags', 'progress', 'estimated_hours', 'actual_hours',
+    'dependencies', 'category', 'notes',
+))
+
+
+def _row_to_task(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert a task_metadata row to a dict with its JSON columns decoded."""
+    task = dict(row)
+    task['tags'] = loads(task['tags']) if task['tags'] else []
+    task['dependencies'] = loads(task['dependencies']) if task['dependencies'] else []
+    task['json_data'] = loads(task['json_data']) if task['json_data'] else {}
+    return task
 
 
 class TaskDatabase:
     """SQLite database manager for task metadata."""
     
+    # Database files whose directory and schema were already set up in this process
+    _initialized_paths = set()
+    
     def __init__(self, db_path: str = None):
         if db_path is None:
             # Use absolute path relative to this file
             self.db_path = Path(__file__).parent.parent / "data" / "tasks.db"
         else:
             self.db_path = Path(db_path)
-            
-        self.db_path.parent.mkdir(exist_ok=True)
-        self.init_database()
+        
+        # Skip the mkdir and schema statements for a file we already prepared,
+        # as long as it has not been removed since. Keyed by the absolute path so a
+        # relative db_path used from another working directory is set up again.
+        resolved_path = self.db_path.resolve()
+        if resolved_path not in TaskDatabase._initialized_paths or not self.db_path.exists():
+            self.db_path.parent.mkdir(exist_ok=True)
+            self.init_database()
+            TaskDatabase._initialized_paths.add(resolved_path)
     
     def init_database(self):
         """Initialize database with task_metadata table."""
@@ -53,6 +85,16 @@ class TaskDatabase:
                     json_data TEXT
                 )
             """)
+            # get_all_tasks orders by created_at; let SQLite walk the index instead of sorting
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_task_metadata_created_at
+                ON task_metadata (created_at)
+            """)
+            # Serves status-filtered listings in the same order
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_task_metadata_status_created_at
+                ON task_metadata (status, created_at)
+            """)
             conn.commit()
     
     def create_or_update_task(self, task_data: Dict[str, Any], json_data: Dict[str, Any]) -> bool:
@@ -69,104 +111,115 @@ class TaskDatabase:
         try:
             with sqlite3.connect(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row  # Enable column access by name
-                
-                # Check if task exists to get current values
-                existing_task = None
-                if task_data.get('id') or json_data.get('id'):
-                    task_id = task_data.get('id') or json_data.get('id')
-                    cursor = conn.execute("SELECT * FROM task_metadata WHERE id = ?", (task_id,))
-                    existing_task = cursor.fetchone()
-                
-                if existing_task:
-                    # Update existing task - use task_data values, then json_data, then existing values
-                    new_title = task_data.get('title') or json_data.get('title') or existing_task['title']
-                    new_description = task_data.get('description') or json_data.get('description') or existing_task['description']
-                    new_status = task_data.get('status') or json_data.get('status') or existing_task['status']
-                    new_priority = task_data.get('priority') or json_data.get('priority') or existing_task['priority']
-                    
-                    # Check if any critical field has changed to determine if updated_at should change
-                    has_changes = (
-                        new_title != existing_task['title'] or
-                        new_description != existing_task['description'] or
-                        new_status != existing_task['status'] or
-                        new_priority != existing_task['priority']
-                    )
-                    
-                    merged_data = {
-                        'id': task_id,
-                        'title': new_title,
-                        'description': new_description,
-                        'status': new_status,
-                        'priority': new_priority,
-                        'planned_start_time': task_data.get('planned_start_time') or json_data.get('planned_start_time') or existing_task['planned_start_time'],
-                        'planned_end_time': task_data.get('planned_end_time') or json_data.get('planned_end_time') or existing_task['planned_end_time'],
-                        'actual_start_time': task_data.get('actual_start_time') or json_data.get('actual_start_time') or existing_task['actual_start_time'],
-                        'actual_end_time': task_data.get('actual_end_time') or json_data.get('actual_end_time') or existing_task['actual_end_time'],
-                        'assigned_to': task_data.get('assigned_to') or json_data.get('assigned_to') or existing_task['assigned_to'],
-                        'created_by': task_data.get('created_by') or json_data.get('created_by') or existing_task['created_by'],
-                        'tags': json.dumps(task_data.get('tags') or json_data.get('tags') or json.loads(existing_task['tags'] or '[]')),
-                        'progress': task_data.get('progress') if task_data.get('progress') is not None else (json_data.get('progress') if json_data.get('progress') is not None else existing_task['progress']),
-                        'estimated_hours': task_data.get('estimated_hours') or json_data.get('estimated_hours') or existing_task['estimated_hours'],
-                        'actual_hours': task_data.get('actual_hours') or json_data.get('actual_hours') or existing_task['actual_hours'],
-                        'dependencies': json.dumps(task_data.get('dependencies') or json_data.get('dependencies') or json.loads(existing_task['dependencies'] or '[]')),
-                        'category': task_data.get('category') or json_data.get('category') or existing_task['category'],
-                        'notes': task_data.get('notes') or json_data.get('notes') or existing_task['notes'],
-                        'created_at': existing_task['created_at'],
-                        'updated_at': datetime.now().isoformat() if has_changes else existing_task['updated_at'],
-                        'json_data': json.dumps(json_data, ensure_ascii=False) if json_data else existing_task['json_data']
-                    }
-                else:
-                    # Create new task - use provided data or defaults
-                    task_id = task_data.get('id') or json_data.get('id', '')
-                    title = task_data.get('title') or json_data.get('title', '')
-                    description = task_data.get('description') or json_data.get('description', '')
-                    status = task_data.get('status') or json_data.get('status', 'pending')
-                    created_at = task_data.get('created_at') or json_data.get('created_at', datetime.now().isoformat())
-                    
-                    merged_data = {
-                        'id': task_id,
-                        'title': title,
-                        'description': description,
-                        'status': status,
-                        'priority': task_data.get('priority', 1),
-                        'planned_start_time': task_data.get('planned_start_time'),
-                        'planned_end_time': task_data.get('planned_end_time'),
-                        'actual_start_time': task_data.get('actual_start_time'),
-                        'actual_end_time': task_data.get('actual_end_time'),
-                        'assigned_to': task_data.get('assigned_to'),
-                        'created_by': task_data.get('created_by'),
-                        'tags': json.dumps(task_data.get('tags', [])),
-                        'progress': task_data.get('progress', 0),
-                        'estimated_hours': task_data.get('estimated_hours'),
-                        'actual_hours': task_data.get('actual_hours'),
-                        'dependencies': json.dumps(task_data.get('dependencies', [])),
-                        'category': task_data.get('category'),
-                        'notes': task_data.get('notes'),
-                        'created_at': created_at,
-                        'updated_at': task_data.get('updated_at', datetime.now().isoformat()),
-                        'json_data': json.dumps(json_data, ensure_ascii=False)
-                    }
-                
-                # Insert or replace
-                conn.execute("""
-                    INSERT OR REPLACE INTO task_metadata (
-                        id, title, description, status, priority,
-                        planned_start_time, planned_end_time, actual_start_time, actual_end_time,
-                        assigned_to, created_by, tags, progress, estimated_hours, actual_hours,
-                        dependencies, category, notes, created_at, updated_at, json_data
-                    ) VALUES (
-                        :id, :title, :description, :status, :priority,
-                        :planned_start_time, :planned_end_time, :actual_start_time, :actual_end_time,
-                        :assigned_to, :created_by, :tags, :progress, :estimated_hours, :actual_hours,
-                        :dependencies, :category, :notes, :created_at, :updated_at, :json_data
-                    )
-                """, merged_data)
+                self._upsert_task(conn, task_data, json_data)
                 conn.commit()
                 return True
         except Exception as e:
             print(f"Error creating/updating task: {e}")
             return False
     
+    def _upsert_task(self, conn: sqlite3.Connection, task_data: Dict[str, Any], json_data: Dict[str, Any]) -> None:
+        """
+        Merge and write one task on an open connection without committing.
+        
+        Args:
+            conn: Connection with row_factory set to sqlite3.Row
+            task_data: Task metadata fields
+            json_data: Complete task JSON from task tree
+        """
+        # Check if task exists to get current values
+        existing_task = None
+        if task_data.get('id') or json_data.get('id'):
+            task_id = task_data.get('id') or json_data.get('id')
+            cursor = conn.execute("SELECT * FROM task_metadata WHERE id = ?", (task_id,))
+            existing_task = cursor.fetchone()
+        
+        if existing_task:
+            # Update existing task - use task_data values, then json_data, then existing values
+            new_title = task_data.get('title') or json_data.get('title') or existing_task['title']
+            new_description = task_data.get('description') or json_data.get('description') or existing_task['description']
+            new_status = task_data.get('status') or json_data.get('status') or existing_task['status']
+            new_priority = task_data.get('priority') or json_data.get('priority') or existing_task['priority']
+        
+            # Check if any critical field has changed to determine if updated_at should change
+            has_changes = (
+                new_title != existing_task['title'] or
+                new_description != existing_task['description'] or
+                new_status != existing_task['status'] or
+                new_priority != existing_task['priority']
+            )
+        
+            merged_data = {
+                'id': task_id,
+                'title': new_title,
+                'description': new_description,
+                'status': new_status,
+                'priority': new_priority,
+                'planned_start_time': task_data.get('planned_start_time') or json_data.get('planned_start_time') or existing_task['planned_start_time'],
+                'planned_end_time': task_data.get('planned_end_time') or json_data.get('planned_end_time') or existing_task['planned_end_time'],
+                'actual_start_time': task_data.get('actual_start_time') or json_data.get('actual_start_time') or existing_task['actual_start_time'],
+                'actual_end_time': task_data.get('actual_end_time') or json_data.get('actual_end_time') or existing_task['actual_end_time'],
+                'assigned_to': task_data.get('assigned_to') or json_data.get('assigned_to') or existing_task['assigned_to'],
+                'created_by': task_data.get('created_by') or json_data.get('created_by') or existing_task['created_by'],
+                'tags': json.dumps(task_data.get('tags') or json_data.get('tags') or loads(existing_task['tags'] or '[]')),
+                'progress': task_data.get('progress') if task_data.get('progress') is not None else (json_data.get('progress') if json_data.get('progress') is not None else existing_task['progress']),
+                'estimated_hours': task_data.get('estimated_hours') or json_data.get('estimated_hours') or existing_task['estimated_hours'],
+                'actual_hours': task_data.get('actual_hours') or json_data.get('actual_hours') or existing_task['actual_hours'],
+                'dependencies': json.dumps(task_data.get('dependencies') or json_data.get('dependencies') or loads(existing_task['dependencies'] or '[]')),
+                'category': task_data.get('category') or json_data.get('category') or existing_task['category'],
+                'notes': task_data.get('notes') or json_data.get('notes') or existing_task['notes'],
+                'created_at': existing_task['created_at'],
+                'updated_at': datetime.now().isoformat() if has_changes else existing_task['updated_at'],
+                'json_data': json.dumps(json_data, ensure_ascii=False) if json_data else existing_task['json_data']
+            }
+        else:
+            # Create new task - use provided data or defaults
+            task_id = task_data.get('id') or json_data.get('id', '')
+            title = task_data.get('title') or json_data.get('title', '')
+            description = task_data.get('description') or json_data.get('description', '')
+            status = task_data.get('status') or json_data.get('status', 'pending')
+            created_at = task_data.get('created_at') or json_data.get('created_at', datetime.now().isoformat())
+            updated_at = task_data.get('updated_at') or json_data.get('updated_at', datetime.now().isoformat())
+        
+            merged_data = {
+                'id': task_id,
+                'title': title,
+                'description': description,
+                'status': status,
+                'priority': task_data.get('priority', 1),
+                'planned_start_time': task_data.get('planned_start_time'),
+                'planned_end_time': task_data.get('planned_end_time'),
+                'actual_start_time': task_data.get('actual_start_time'),
+                'actual_end_time': task_data.get('actual_end_time'),
+                'assigned_to': task_data.get('assigned_to'),
+                'created_by': task_data.get('created_by'),
+                'tags': json.dumps(task_data.get('tags', [])),
+                'progress': task_data.get('progress', 0),
+                'estimated_hours': task_data.get('estimated_hours'),
+                'actual_hours': task_data.get('actual_hours'),
+                'dependencies': json.dumps(task_data.get('dependencies', [])),
+                'category': task_data.get('category'),
+                'notes': task_data.get('notes'),
+                'created_at': created_at,
+                'updated_at': updated_at,
+                'json_data': json.dumps(json_data, ensure_ascii=False)
+            }
+        
+        # Insert or replace
+        conn.execute("""
+            INSERT OR REPLACE INTO task_metadata (
+                id, title, description, status, priority,
+                planned_start_time, planned_end_time, actual_start_time, actual_end_time,
+                assigned_to, created_by, tags, progress, estimated_hours, actual_hours,
+                dependencies, category, notes, created_at, updated_at, json_data
+            ) VALUES (
+                :id, :title, :description, :status, :priority,
+                :planned_start_time, :planned_end_time, :actual_start_time, :actual_end_time,
+                :assigned_to, :created_by, :tags, :progress, :estimated_hours, :actual_hours,
+                :dependencies, :category, :notes, :created_at, :updated_at, :json_data
+            )
+        """, merged_data)
+    
     def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Get task metadata by ID."""
         try:
@@ -178,44 +231,55 @@ class TaskDatabase:
                 row = cursor.fetchone()
                 
                 if row:
-                    task = dict(row)
-                    # Parse JSON fields
-                    task['tags'] = json.loads(task['tags']) if task['tags'] else []
-                    task['dependencies'] = json.loads(task['dependencies']) if task['dependencies'] else []
-                    task['json_data'] = json.loads(task['json_data']) if task['json_data'] else {}
-                    return task
+                    return _row_to_task(row)
                 return None
         except Exception as e:
             print(f"Error getting task: {e}")
             return None
     
-    def get_all_tasks(self) -> List[Dict[str, Any]]:
-        """Get all task metadata."""
+    def get_all_tasks(self, status: Optional[str] = None, limit: Optional[int] = None,
+                      offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get all task metadata, newest first.
+        
+        Args:
+            status: Only return tasks with this status (None for all)
+            limit: Maximum number of tasks to return (None for no limit)
+            offset: Number of tasks to skip
+            
+        Returns:
+            List of task metadata dictionaries
+        """
+        # Filter and paginate in SQLite rather than in Python
+        query = "SELECT * FROM task_metadata"
+        params = []
+        if status is not None:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC"
+        if limit is not None or offset:
+            query += " LIMIT ? OFFSET ?"
+            params.extend((-1 if limit is None else limit, offset))
+        
         try:
             with sqlite3.connect(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row
-                cursor = conn.execute("SELECT * FROM task_metadata ORDER BY created_at DESC")
-                rows = cursor.fetchall()
-                
-                tasks = []
-                for row in rows:
-                    task = dict(row)
-                    task['tags'] = json.loads(task['tags']) if task['tags'] else []
-                    task['dependencies'] = json.loads(task['dependencies']) if task['dependencies'] else []
-                    task['json_data'] = json.loads(task['json_data']) if task['json_data'] else {}
-                    tasks.append(task)
-                
-                return tasks
+                cursor = conn.execute(query, params)
+                return [_row_to_task(row) for row in cursor]
         except Exception as e:
             print(f"Error getting all tasks: {e}")
             return []
     
     def update_task_field(self, task_id: str, field: str, value: Any) -> bool:
         """Update a specific field of a task."""
+        if field not in _UPDATABLE_FIELDS:
+            print(f"Error updating task field: unknown field '{field}'")
+            return False
+        
         try:
             with sqlite3.connect(self.db_path) as conn:
                 # Handle JSON fields
-                if field in ['tags', 'dependencies']:
+                if field in _JSON_LIST_FIELDS:
                     value = json.dumps(value)
                 
                 conn.execute(
@@ -239,6 +303,53 @@ class TaskDatabase:
             print(f"Error deleting task: {e}")
             return False
     
+    def delete_tasks(self, task_ids: List[str]) -> bool:
+        """
+        Delete several tasks in one transaction.
+        
+        Args:
+            task_ids: IDs of the tasks to delete
+            
+        Returns:
+            Success status
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.executemany(
+                    "DELETE FROM task_metadata WHERE id = ?",
+                    [(task_id,) for task_id in task_ids]
+                )
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Error deleting tasks: {e}")
+            return False
+    
+    def rename_tasks(self, id_mapping: Dict[str, str]) -> Dict[str, str]:
+        """
+        Change task IDs in place, in one transaction.
+        
+        Args:
+            id_mapping: Dictionary mapping old IDs to new IDs
+            
+        Returns:
+            The subset of id_mapping whose old ID existed in the database
+        """
+        renamed = {}
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                for old_id, new_id in id_mapping.items():
+                    cursor = conn.execute(
+                        "UPDATE task_metadata SET id = ? WHERE id = ?", (new_id, old_id)
+                    )
+                    if cursor.rowcount:
+                        renamed[old_id] = new_id
+                conn.commit()
+                return renamed
+        except Exception as e:
+            print(f"Error renaming tasks: {e}")
+            return {}
+    
     def sync_from_task_tree(self, task_tree: Dict[str, Any]) -> bool:
         """
         Sync all tasks from task tree JSON to database.
@@ -269,9 +380,16 @@ class TaskDatabase:
             all_tasks = extract_tasks(task_tree)
             success_count = 0
             
-            for task in all_tasks:
-                if self.create_or_update_task({}, task):
-                    success_count += 1
+            # One connection and one commit for the whole tree instead of one per task
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                for task in all_tasks:
+                    try:
+                        self._upsert_task(conn, {}, task)
+                        success_count += 1
+                    except Exception as e:
+                        print(f"Error creating/updating task: {e}")
+                conn.commit()
             
             print(f"Synced {success_count}/{len(all_tasks)} tasks to database")
             return success_count == len(all_tasks)
@@ -281,5 +399,14 @@ class TaskDatabase:
             return False
 
 
-# Global database instance
-db = TaskDatabase()
\ No newline at end of file
+_db = None
+
+
+def __getattr__(name: str):
+    """Create the global database instance (``db``) on first access, not at import time."""
+    global _db
+    if name == "db":
+        if _db is None:
+            _db = TaskDatabase()
+        return _db
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+JSON helpers that use orjson when it is installed and fall back to the stdlib.
+"""
+
+import json
+import os
+import secrets
+from typing import Any, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_bytes(data: Any, indent: bool = False) -> bytes:
+    """
+    Serialize data to UTF-8 encoded JSON, keeping non-ASCII characters as-is.
+
+    Args:
+        data: The object to serialize
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        The JSON document as bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document from str or bytes.
+
+    Raises:
+        json.JSONDecodeError: If the document is invalid (orjson's error subclasses it)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Flags for creating write_atomic's temporary file; O_EXCL guards against name clashes
+_TMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+def _create_temp_file(directory: str, name: str) -> Tuple[int, str]:
+    """
+    Create a new, uniquely named file next to the target.
+    
+    The file is opened with mode 0o666 so the kernel applies the process umask,
+    giving it the permissions a plain open() would.
+    
+    Returns:
+        The open file descriptor and the file's path
+    """
+    while True:
+        tmp_path = os.path.join(directory, f".{name}.{secrets.token_hex(8)}.tmp")
+        try:
+            return os.open(tmp_path, _TMP_FLAGS, 0o666), tmp_path
+        except FileExistsError:
+            continue
+
+
+def write_atomic(path: Union[str, os.PathLike], data: bytes) -> None:
+    """
+    Replace a file's contents in one step, so readers never see a partial write.
+    
+    The data goes to a temporary file in the same directory, is flushed to
+    disk, and is then renamed over the target. The target keeps its existing
+    permissions; a new file gets the mode open() would have given it.
+    
+    Args:
+        path: The file to write
+        data: The complete new contents
+        
+    Raises:
+        OSError: If the temporary file cannot be written or renamed
+    """
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = None
+    
+    directory, name = os.path.split(os.fspath(path))
+    fd, tmp_path = _create_temp_file(directory or ".", name)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
@@ -1,6 +1,11 @@
+import functools
+import hashlib
 import json
 import logging
-from typing import Dict, Any
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional
 
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
@@ -8,32 +13,157 @@ from langchain_openai import ChatOpenAI
 # Handle imports for both package and standalone execution
 try:
     from .config import config
+    from .json_utils import dumps_bytes, loads, write_atomic
 except ImportError:
     # Standalone execution
     from config import config
+    from json_utils import dumps_bytes, loads, write_atomic
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Number of analysis reports each LLMClient keeps for repeated queries
+ANALYSIS_CACHE_SIZE = 64
+
+
+@functools.lru_cache(maxsize=None)
+def _get_chat_model(model: str, api_key: str, base_url: str, temperature: float, max_tokens: int) -> ChatOpenAI:
+    """
+    Build the chat model once per distinct configuration.
+    
+    The model owns the HTTP client, so sharing it lets every LLMClient in the
+    process reuse the same keep-alive connection pool.
+    """
+    return ChatOpenAI(
+        model=model,
+        openai_api_key=api_key,
+        openai_api_base=base_url,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+
+
+def _analysis_cache_path(model: str, prompt: str) -> Path:
+    """Name the on-disk cache entry for a prompt by hashing it together with the model."""
+    digest = hashlib.blake2b(f"{model}\0{prompt}".encode("utf-8"), digest_size=20).hexdigest()
+    return Path(config.ANALYSIS_CACHE_DIR) / f"{digest}.md"
+
+
+def _read_cached_analysis(path: Path) -> Optional[str]:
+    """Return a persisted report, or None if there is none or the disk cache is disabled."""
+    if config.ANALYSIS_CACHE_MAX_ENTRIES <= 0:
+        return None
+    try:
+        report = path.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    # Bump the mtime so pruning treats the entry as recently used; on a read-only
+    # filesystem the report is still good, it just ages normally
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return report
+
+
+def _prune_analysis_cache(cache_dir: Path, max_entries: int) -> None:
+    """Delete the least recently used reports beyond max_entries."""
+    entries = []
+    for path in cache_dir.glob("*.md"):
+        try:
+            entries.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            continue  # Removed concurrently
+    if len(entries) <= max_entries:
+        return
+    entries.sort(reverse=True)
+    for _, path in entries[max_entries:]:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def _write_cached_analysis(path: Path, report: str) -> None:
+    """Persist a report atomically and prune old ones; failures only cost the cache entry."""
+    max_entries = config.ANALYSIS_CACHE_MAX_ENTRIES
+    if max_entries <= 0:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(path, report.encode("utf-8"))
+        _prune_analysis_cache(path.parent, max_entries)
+    except OSError as e:
+        logger.warning("[分析缓存] 写入失败: %s", e)
+
+
+class _JsonObjectScanner:
+    """
+    Track brace depth across streamed chunks to spot the end of the first JSON object.
+    
+    Braces inside string literals (including escaped quotes) are ignored.
+    """
+    
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> bool:
+        """
+        Consume the next chunk of the response.
+        
+        Args:
+            text: Newly received text
+            
+        Returns:
+            True once the first top-level object has been closed
+        """
+        for ch in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                if self.started:
+                    self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+                self.started = True
+            elif ch == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
 
 class LLMClient:
     """Client for processing tasks using LLM."""
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=config.MODEL_NAME,
-            openai_api_key=config.MODEL_API_KEY,
-            openai_api_base=config.MODEL_BASE_URL,
-            temperature=config.TEMPERATURE,
-            max_tokens=config.MAX_TOKENS
+        self.llm = _get_chat_model(
+            config.MODEL_NAME,
+            config.MODEL_API_KEY,
+            config.MODEL_BASE_URL,
+            config.TEMPERATURE,
+            config.MAX_TOKENS
         )
         
+        # process_task_input renders via config.render_task_prompt; the chain is
+        # kept for scripts that invoke it directly
         self.prompt = PromptTemplate(
             template=config.TASK_PROMPT_TEMPLATE,
             input_variables=["current_task_tree", "user_input"]
         )
         
         self.chain = self.prompt | self.llm
+        
+        # (tasks_json, query_request, query_type) -> report, least recently used first
+        self._analysis_cache = OrderedDict()
     
     def process_task_input(self, current_task_tree: Dict[str, Any], user_input: str) -> Dict[str, Any]:
         """
@@ -48,24 +178,29 @@ class LLMClient:
             - operations: List of operations (add/update/delete)
             - message: Description of what was done
         """
-        task_tree_json = json.dumps(current_task_tree, ensure_ascii=False, indent=2)
+        # Compact JSON: indentation only costs prompt tokens
+        task_tree_json = dumps_bytes(current_task_tree).decode("utf-8")
         
-        logger.info(f"[LLM请求] 用户输入: {user_input}")
+        logger.info("[LLM请求] 用户输入: %s", user_input)
         
-        response = self.chain.invoke({
-            "current_task_tree": task_tree_json,
-            "user_input": user_input
-        })
+        # Stream the response and stop reading once the operations object is
+        # complete, instead of waiting for any trailing text the model adds
+        scanner = _JsonObjectScanner()
+        parts = []
+        for chunk in self.llm.stream(config.render_task_prompt(task_tree_json, user_input)):
+            parts.append(chunk.content)
+            if scanner.feed(chunk.content):
+                break
         
         # Extract JSON from response
-        content = response.content
-        logger.info(f"[LLM响应] {content}")
+        content = "".join(parts)
+        logger.info("[LLM响应] %s", content)
         
         try:
             json_start = content.index("{")
             json_end = content.rindex("}") + 1
             response_json = content[json_start:json_end]
-            result = json.loads(response_json)
+            result = loads(response_json)
             
             # Validate response format
             if "operations" not in result:
@@ -74,12 +209,13 @@ class LLMClient:
             
             # Log operations summary
             ops = result.get("operations", [])
-            logger.info(f"[操作摘要] 共 {len(ops)} 个操作: {[op.get('operation') for op in ops]}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("[操作摘要] 共 %d 个操作: %s", len(ops), [op.get('operation') for op in ops])
             
             return result
             
         except (ValueError, json.JSONDecodeError) as e:
-            logger.error(f"[解析失败] {e}")
+            logger.error("[解析失败] %s", e)
             return {"operations": [], "message": f"解析LLM响应失败: {str(e)}"}
     
     def generate_analysis(self, tasks_data: list, query_request: str, query_type: str = "list") -> str:
@@ -94,38 +230,42 @@ class LLMClient:
         Returns:
             Markdown formatted analysis report
         """
-        tasks_json = json.dumps(tasks_data, ensure_ascii=False, indent=2)
+        tasks_json = dumps_bytes(tasks_data).decode("utf-8")
         
-        analysis_prompt = f"""
-        你是一个数据分析助手。请根据以下任务/记录数据，生成分析报告。
-        
-        数据:
-        {tasks_json}
-        
-        用户请求: {query_request}
-        分析类型: {query_type}
-        
-        要求:
-        1. 使用中文回复
-        2. 输出格式为 Markdown
-        3. 根据分析类型生成相应内容:
-           - list: 生成清晰的列表，按时间排序
-           - analyze: 分析数据趋势、变化规律
-           - summary: 生成汇总报告，包括统计信息
-        4. 如果数据包含数值（如体重、金额），尝试分析变化趋势
-        5. 如果有时间信息，按时间顺序整理
-        6. 保持简洁，重点突出
+        # The same question over unchanged data gets the cached report
+        cache_key = (tasks_json, query_request, query_type)
+        report = self._analysis_cache.get(cache_key)
+        if report is not None:
+            self._analysis_cache.move_to_end(cache_key)
+            logger.info("[分析缓存] 类型: %s, 数据条数: %d", query_type, len(tasks_data))
+            return report
         
-        直接输出 Markdown 内容，不要包含额外说明。
-        """
+        # Then the report persisted by an earlier run for the identical prompt
+        analysis_prompt = config.render_analysis_prompt(tasks_json, query_request, query_type)
+        cache_path = _analysis_cache_path(config.MODEL_NAME, analysis_prompt)
+        report = _read_cached_analysis(cache_path)
+        if report is not None:
+            self._remember_analysis(cache_key, report)
+            logger.info("[分析缓存] 类型: %s, 数据条数: %d (磁盘)", query_type, len(tasks_data))
+            return report
         
-        logger.info(f"[分析请求] 类型: {query_type}, 数据条数: {len(tasks_data)}")
+        logger.info("[分析请求] 类型: %s, 数据条数: %d", query_type, len(tasks_data))
         
         try:
             response = self.llm.invoke(analysis_prompt)
             report = response.content.strip()
-            logger.info(f"[分析完成] 报告长度: {len(report)} 字符")
+            logger.info("[分析完成] 报告长度: %d 字符", len(report))
+            
+            # Only successful reports are cached; failures are retried next time
+            _write_cached_analysis(cache_path, report)
+            self._remember_analysis(cache_key, report)
             return report
         except Exception as e:
-            logger.error(f"[分析失败] {e}")
-            return f"## 分析失败\n\n生成报告时出错: {str(e)}"
\ No newline at end of file
+            logger.error("[分析失败] %s", e)
+            return f"## 分析失败\n\n生成报告时出错: {str(e)}"
+    
+    def _remember_analysis(self, cache_key: tuple, report: str) -> None:
+        """Store a report in the in-memory LRU, evicting the oldest entry when full."""
+        self._analysis_cache[cache_key] = report
+        if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
\ No newline at end of file
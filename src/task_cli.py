@@ -4,160 +4,144 @@ Task metadata management CLI tool.
 """
 
 import argparse
+import functools
 import json
 from datetime import datetime
 
-# Import task manager (now in the same directory)
-try:
-    from .task_manager import TaskManager
-except ImportError:
-    from task_manager import TaskManager
 
+def _create_task_manager():
+    """Import and build the TaskManager only once a command actually runs."""
+    # Import task manager (now in the same directory)
+    try:
+        from .task_manager import TaskManager
+    except ImportError:
+        from task_manager import TaskManager
+    return TaskManager()
 
-def list_tasks(args):
+
+def _non_negative_int(value: str) -> int:
+    """argparse type for counts; SQLite would read a negative LIMIT as "no limit"."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be a non-negative integer, got {number}")
+    return number
+
+
+# Values accepted by the --status options
+_STATUS_CHOICES = ('pending', 'in_progress', 'completed')
+
+# (argparse attribute, metadata field) pairs copied as-is by the update command
+_UPDATE_FIELDS = (
+    ('title', 'title'),
+    ('description', 'description'),
+    ('status', 'status'),
+    ('priority', 'priority'),
+    ('assigned_to', 'assigned_to'),
+    ('planned_start', 'planned_start_time'),
+    ('planned_end', 'planned_end_time'),
+    ('progress', 'progress'),
+    ('category', 'category'),
+    ('estimated_hours', 'estimated_hours'),
+    ('notes', 'notes'),
+)
+
+
+def list_tasks(task_manager, args):
     """List all tasks with metadata."""
-    task_manager = TaskManager()
-    tasks = task_manager.get_all_tasks_metadata()
+    tasks = task_manager.get_all_tasks_metadata(status=args.status, limit=args.limit, offset=args.offset)
     
     if not tasks:
         print("No tasks found in database.")
         return
     
-    print(f"\nFound {len(tasks)} tasks:\n")
+    # Collect the whole listing and write it once rather than one print per field
+    lines = [f"\nFound {len(tasks)} tasks:\n"]
+    append = lines.append
     
     for task in tasks:
-        print(f"📋 Task ID: {task['id']}")
-        print(f"   Title: {task['title']}")
-        print(f"   Status: {task['status']}")
-        print(f"   Priority: {task['priority']}")
+        append(f"📋 Task ID: {task['id']}")
+        append(f"   Title: {task['title']}")
+        append(f"   Status: {task['status']}")
+        append(f"   Priority: {task['priority']}")
         
         if task.get('assigned_to'):
-            print(f"   Assigned to: {task['assigned_to']}")
+            append(f"   Assigned to: {task['assigned_to']}")
         
         if task.get('planned_start_time'):
-            print(f"   Planned start: {task['planned_start_time']}")
+            append(f"   Planned start: {task['planned_start_time']}")
         
         if task.get('planned_end_time'):
-            print(f"   Planned end: {task['planned_end_time']}")
+            append(f"   Planned end: {task['planned_end_time']}")
         
         if task.get('progress', 0) > 0:
-            print(f"   Progress: {task['progress']}%")
+            append(f"   Progress: {task['progress']}%")
         
         if task.get('category'):
-            print(f"   Category: {task['category']}")
+            append(f"   Category: {task['category']}")
         
         if task.get('tags'):
             tags = ', '.join(task['tags'])
-            print(f"   Tags: {tags}")
+            append(f"   Tags: {tags}")
         
-        print()
+        append("")
+    
+    print("\n".join(lines))
 
 
-def show_task(args):
+def show_task(task_manager, args):
     """Show detailed information for a specific task."""
-    task_manager = TaskManager()
     task = task_manager.get_task_metadata(args.task_id)
     
     if not task:
         print(f"Task with ID '{args.task_id}' not found.")
         return
     
-    print(f"\n📋 Task Details for {args.task_id}:\n")
-    print(f"Title: {task['title']}")
-    print(f"Description: {task['description']}")
-    print(f"Status: {task['status']}")
-    print(f"Priority: {task['priority']}")
-    print(f"Created: {task['created_at']}")
-    print(f"Updated: {task['updated_at']}")
-    
-    # Optional fields
-    if task.get('planned_start_time'):
-        print(f"Planned start: {task['planned_start_time']}")
-    
-    if task.get('planned_end_time'):
-        print(f"Planned end: {task['planned_end_time']}")
-    
-    if task.get('actual_start_time'):
-        print(f"Actual start: {task['actual_start_time']}")
-    
-    if task.get('actual_end_time'):
-        print(f"Actual end: {task['actual_end_time']}")
-    
-    if task.get('assigned_to'):
-        print(f"Assigned to: {task['assigned_to']}")
-    
-    if task.get('created_by'):
-        print(f"Created by: {task['created_by']}")
-    
-    if task.get('progress', 0) > 0:
-        print(f"Progress: {task['progress']}%")
-    
-    if task.get('estimated_hours'):
-        print(f"Estimated hours: {task['estimated_hours']}")
-    
-    if task.get('actual_hours'):
-        print(f"Actual hours: {task['actual_hours']}")
-    
-    if task.get('category'):
-        print(f"Category: {task['category']}")
-    
-    if task.get('tags'):
-        tags = ', '.join(task['tags'])
-        print(f"Tags: {tags}")
-    
-    if task.get('dependencies'):
-        deps = ', '.join(task['dependencies'])
-        print(f"Dependencies: {deps}")
-    
-    if task.get('notes'):
-        print(f"Notes: {task['notes']}")
-    
-    print()
+    tags = task.get('tags')
+    deps = task.get('dependencies')
+    progress = task.get('progress', 0)
+    
+    # Optional fields collapse to None and are dropped by filter()
+    lines = filter(None, [
+        f"\n📋 Task Details for {args.task_id}:\n",
+        f"Title: {task['title']}",
+        f"Description: {task['description']}",
+        f"Status: {task['status']}",
+        f"Priority: {task['priority']}",
+        f"Created: {task['created_at']}",
+        f"Updated: {task['updated_at']}",
+        f"Planned start: {task['planned_start_time']}" if task.get('planned_start_time') else None,
+        f"Planned end: {task['planned_end_time']}" if task.get('planned_end_time') else None,
+        f"Actual start: {task['actual_start_time']}" if task.get('actual_start_time') else None,
+        f"Actual end: {task['actual_end_time']}" if task.get('actual_end_time') else None,
+        f"Assigned to: {task['assigned_to']}" if task.get('assigned_to') else None,
+        f"Created by: {task['created_by']}" if task.get('created_by') else None,
+        f"Progress: {progress}%" if progress > 0 else None,
+        f"Estimated hours: {task['estimated_hours']}" if task.get('estimated_hours') else None,
+        f"Actual hours: {task['actual_hours']}" if task.get('actual_hours') else None,
+        f"Category: {task['category']}" if task.get('category') else None,
+        f"Tags: {', '.join(tags)}" if tags else None,
+        f"Dependencies: {', '.join(deps)}" if deps else None,
+        f"Notes: {task['notes']}" if task.get('notes') else None,
+    ])
+    print("\n".join(lines) + "\n")
 
 
-def update_task(args):
+def update_task(task_manager, args):
     """Update task metadata."""
-    task_manager = TaskManager()
     
     # Build update data
-    update_data = {}
-    
-    if args.title:
-        update_data['title'] = args.title
-    
-    if args.description:
-        update_data['description'] = args.description
-    
-    if args.status:
-        update_data['status'] = args.status
-    
-    if args.priority:
-        update_data['priority'] = args.priority
-    
-    if args.assigned_to:
-        update_data['assigned_to'] = args.assigned_to
-    
-    if args.planned_start:
-        update_data['planned_start_time'] = args.planned_start
-    
-    if args.planned_end:
-        update_data['planned_end_time'] = args.planned_end
-    
-    if args.progress:
-        update_data['progress'] = args.progress
-    
-    if args.category:
-        update_data['category'] = args.category
-    
-    if args.estimated_hours:
-        update_data['estimated_hours'] = args.estimated_hours
+    update_data = {
+        field: getattr(args, attr)
+        for attr, field in _UPDATE_FIELDS
+        if getattr(args, attr)
+    }
     
     if args.tags:
         update_data['tags'] = args.tags.split(',')
     
-    if args.notes:
-        update_data['notes'] = args.notes
-    
     if not update_data:
         print("No update data provided.")
         return
@@ -171,24 +155,30 @@ def update_task(args):
         print(f"✗ Failed to update task {args.task_id}.")
 
 
-def main():
-    """Main CLI function."""
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser once; repeated main() calls reuse it."""
     parser = argparse.ArgumentParser(description="Task Metadata Management Tool")
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # List tasks
     list_parser = subparsers.add_parser('list', help='List all tasks')
+    list_parser.add_argument('--status', choices=_STATUS_CHOICES, help='Only list tasks with this status')
+    list_parser.add_argument('--limit', type=_non_negative_int, help='Maximum number of tasks to list')
+    list_parser.add_argument('--offset', type=_non_negative_int, default=0, help='Number of tasks to skip')
+    list_parser.set_defaults(handler=list_tasks)
     
     # Show task
     show_parser = subparsers.add_parser('show', help='Show task details')
     show_parser.add_argument('task_id', help='Task ID')
+    show_parser.set_defaults(handler=show_task)
     
     # Update task
     update_parser = subparsers.add_parser('update', help='Update task metadata')
     update_parser.add_argument('task_id', help='Task ID')
     update_parser.add_argument('--title', help='Task title')
     update_parser.add_argument('--description', help='Task description')
-    update_parser.add_argument('--status', choices=['pending', 'in_progress', 'completed'], help='Task status')
+    update_parser.add_argument('--status', choices=_STATUS_CHOICES, help='Task status')
     update_parser.add_argument('--priority', type=int, choices=range(1, 6), help='Task priority (1-5)')
     update_parser.add_argument('--assigned-to', help='Person assigned to this task')
     update_parser.add_argument('--planned-start', help='Planned start time (ISO format)')
@@ -198,17 +188,23 @@ def main():
     update_parser.add_argument('--estimated-hours', type=float, help='Estimated hours')
     update_parser.add_argument('--tags', help='Comma-separated tags')
     update_parser.add_argument('--notes', help='Additional notes')
+    update_parser.set_defaults(handler=update_task)
     
+    return parser
+
+
+def main():
+    """Main CLI function."""
+    parser = _build_parser()
     args = parser.parse_args()
     
-    if args.command == 'list':
-        list_tasks(args)
-    elif args.command == 'show':
-        show_task(args)
-    elif args.command == 'update':
-        update_task(args)
-    else:
+    # Each subparser registers its handler, so dispatch is a single attribute lookup
+    handler = getattr(args, 'handler', None)
+    if handler is None:
         parser.print_help()
+    else:
+        # Arguments are already validated; build the one manager the command uses
+        handler(_create_task_manager(), args)
 
 
 if __name__ == "__main__":
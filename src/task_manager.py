@@ -2,25 +2,55 @@ import json
 import os
 import uuid
 import re
-from typing import Dict, Any, Optional, Set, List
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Any, Optional, Set, List
 
 # Handle imports for both package and standalone execution
 try:
     from .config import config
-    from .llm_client import LLMClient
     from .database import TaskDatabase
+    from .json_utils import dumps_bytes, loads, write_atomic
 except ImportError:
     # Standalone execution
     from config import config
-    from llm_client import LLMClient
     from database import TaskDatabase
+    from json_utils import dumps_bytes, loads, write_atomic
+
+if TYPE_CHECKING:
+    from .llm_client import LLMClient
+
+
+# Canonical form produced by str(uuid.uuid4()); checked before falling back to uuid.UUID()
+_CANONICAL_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+# Operations that change the task tree and therefore require a save
+_MUTATING_OPERATIONS = frozenset(("add", "update", "delete"))
 
 
 class TaskManager:
     def __init__(self):
-        self.llm_client = LLMClient()
+        self._llm_client = None  # Created on first use; metadata-only callers never need it
         self.task_tree_file = config.TASK_TREE_FILE
         self.db = TaskDatabase()  # Initialize database
+        # (mtime_ns, size, inode) of task_tree_file paired with the bytes last read from or written to it
+        self._tree_cache = None
+        self._tree_dir_ready = False  # Set once the task tree directory is known to exist
+    
+    @property
+    def llm_client(self) -> "LLMClient":
+        """The LLM client, built the first time a request needs it."""
+        if self._llm_client is None:
+            # Imported here so metadata-only users never load langchain
+            try:
+                from .llm_client import LLMClient
+            except ImportError:
+                from llm_client import LLMClient
+            self._llm_client = LLMClient()
+        return self._llm_client
+    
+    @llm_client.setter
+    def llm_client(self, client: "LLMClient") -> None:
+        self._llm_client = client
     
     def _initialize_task_tree(self) -> dict:
         """
@@ -29,7 +59,6 @@ class TaskManager:
         Returns:
             The initial task tree as a dictionary
         """
-        from datetime import datetime
         now = datetime.now().isoformat()
         return {
             "id": "root",
@@ -41,28 +70,55 @@ class TaskManager:
             "subtasks": []
         }
     
+    def _tree_file_signature(self) -> Optional[tuple]:
+        """
+        Get a cheap change marker for the task tree file.
+        
+        Returns:
+            (mtime_ns, size, inode) of the file, or None if it cannot be stat'ed
+        """
+        try:
+            st = os.stat(self.task_tree_file)
+        except OSError:
+            return None
+        # Atomic saves replace the file, so the inode changes even within one mtime tick
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    
     def load_task_tree(self) -> dict:
         """
         Load the task tree from the JSON file.
         
+        The file contents are cached until the file changes on disk, so repeated
+        loads within a process skip re-reading it. Each call parses a fresh
+        tree, so callers may modify the result without affecting later loads.
+        
         Returns:
             The task tree as a dictionary
         """
+        signature = self._tree_file_signature()
+        if signature is not None and self._tree_cache is not None and self._tree_cache[0] == signature:
+            return loads(self._tree_cache[1])
+        
+        # Open directly rather than checking os.path.exists first; a missing file
+        # is reported by the open itself
         try:
-            if os.path.exists(self.task_tree_file):
-                with open(self.task_tree_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            else:
-                # Initialize a new task tree if file doesn't exist
-                initial_tree = self._initialize_task_tree()
-                self.save_task_tree(initial_tree)
-                return initial_tree
+            with open(self.task_tree_file, "rb") as f:
+                data = f.read()
+            task_tree = loads(data)
+        except FileNotFoundError:
+            # Initialize a new task tree if file doesn't exist
+            initial_tree = self._initialize_task_tree()
+            self.save_task_tree(initial_tree)
+            return initial_tree
         except json.JSONDecodeError as e:
             print(f"Error loading task tree: {e}")
             # Reinitialize if file is corrupted
             initial_tree = self._initialize_task_tree()
             self.save_task_tree(initial_tree)
             return initial_tree
+        
+        self._tree_cache = (signature, data)
+        return task_tree
     
     def save_task_tree(self, task_tree: dict) -> None:
         """
@@ -72,16 +128,22 @@ class TaskManager:
             task_tree: The task tree to save as a dictionary
         """
         try:
-            # Ensure the directory exists
-            os.makedirs(os.path.dirname(self.task_tree_file), exist_ok=True)
+            # Ensure the directory exists (once per manager rather than on every save)
+            if not self._tree_dir_ready:
+                os.makedirs(os.path.dirname(self.task_tree_file), exist_ok=True)
+                self._tree_dir_ready = True
             
-            with open(self.task_tree_file, "w", encoding="utf-8") as f:
-                json.dump(task_tree, f, ensure_ascii=False, indent=2)
+            # Atomic replace: an interrupted save leaves the previous tree intact
+            data = dumps_bytes(task_tree, indent=True)
+            write_atomic(self.task_tree_file, data)
+            self._tree_cache = (self._tree_file_signature(), data)
             
             # Sync to database
             self.db.sync_from_task_tree(task_tree)
             
         except IOError as e:
+            self._tree_cache = None
+            self._tree_dir_ready = False
             print(f"Error saving task tree: {e}")
     
     def process_user_input(self, user_input: str) -> dict:
@@ -97,6 +159,14 @@ class TaskManager:
         # Load current task tree
         current_tree = self.load_task_tree()
         
+        # Nothing to interpret: skip the LLM round-trip and the save
+        if not user_input or not user_input.strip():
+            return {
+                "tree": current_tree,
+                "operations_applied": [],
+                "message": "输入为空，未执行任何操作"
+            }
+        
         # Get operation instructions from LLM
         llm_result = self.llm_client.process_task_input(current_tree, user_input)
         
@@ -106,8 +176,11 @@ class TaskManager:
         # Apply each operation to the task tree
         results = self.apply_operations(current_tree, operations)
         
-        # Save the updated task tree
-        self.save_task_tree(current_tree)
+        # Save the updated task tree, unless nothing changed (queries only, or every
+        # operation failed); an update that touched no fields reports updated_fields=[]
+        if any(r.get("success") and r.get("operation") in _MUTATING_OPERATIONS and r.get("updated_fields", True)
+               for r in results):
+            self.save_task_tree(current_tree)
         
         return {
             "tree": current_tree,
@@ -127,24 +200,28 @@ class TaskManager:
             List of results for each operation
         """
         results = []
+        # One timestamp for the whole batch: operations from a single request share it
+        now = datetime.now().isoformat()
+        # id -> (node, parent), so each operation finds its target without walking the tree
+        index = self._index_tasks(task_tree)
+        
+        # Operation name -> handler; each handler pulls only the fields it needs
+        handlers = {
+            "add": lambda op: self._add_task(task_tree, op.get("parent_id", "root"), op.get("task", {}), now, index),
+            "update": lambda op: self._update_task(task_tree, op.get("task", {}), now, index),
+            "delete": lambda op: self._delete_task(task_tree, op.get("task", {}).get("id"), index),
+            "query": lambda op: self._query_task(task_tree, op.get("query", {}), index),
+        }
         
         for op in operations:
             op_type = op.get("operation", "").lower()
-            task_data = op.get("task", {})
-            parent_id = op.get("parent_id", "root")
-            query_data = op.get("query", {})
             
             try:
-                if op_type == "add":
-                    result = self._add_task(task_tree, parent_id, task_data)
-                elif op_type == "update":
-                    result = self._update_task(task_tree, task_data)
-                elif op_type == "delete":
-                    result = self._delete_task(task_tree, task_data.get("id"))
-                elif op_type == "query":
-                    result = self._query_task(task_tree, query_data)
-                else:
+                handler = handlers.get(op_type)
+                if handler is None:
                     result = {"success": False, "error": f"Unknown operation: {op_type}"}
+                else:
+                    result = handler(op)
                 
                 results.append({"operation": op_type, **result})
                 
@@ -153,7 +230,8 @@ class TaskManager:
         
         return results
     
-    def _add_task(self, task_tree: dict, parent_id: str, task_data: dict) -> dict:
+    def _add_task(self, task_tree: dict, parent_id: str, task_data: dict, now: str = None,
+                  index: Dict[str, tuple] = None) -> dict:
         """
         Add a new task under the specified parent.
         
@@ -161,15 +239,17 @@ class TaskManager:
             task_tree: The task tree to modify
             parent_id: ID of the parent task
             task_data: Data for the new task
+            now: ISO timestamp to stamp the task with (defaults to the current time)
+            index: Task index from _index_tasks, kept up to date (optional)
             
         Returns:
             Result dictionary with success status and new task ID
         """
-        from datetime import datetime
         
         # Generate UUID for new task
         new_id = str(uuid.uuid4())
-        now = datetime.now().isoformat()
+        if now is None:
+            now = datetime.now().isoformat()
         
         # Create complete task structure
         new_task = {
@@ -183,7 +263,7 @@ class TaskManager:
         }
         
         # Find parent and add task
-        parent = self._find_task_by_id(task_tree, parent_id)
+        parent = self._lookup_task(task_tree, parent_id, index)
         if parent is None:
             return {"success": False, "error": f"Parent task not found: {parent_id}"}
         
@@ -191,31 +271,34 @@ class TaskManager:
             parent["subtasks"] = []
         
         parent["subtasks"].append(new_task)
+        if index is not None:
+            index[new_id] = (new_task, parent)
         
-        # Sync to database
-        self.db.create_or_update_task(new_task, new_task)
+        # The database row is written when the tree is saved (save_task_tree syncs it)
         
         print(f"✓ 添加任务: {new_task['title']} (ID: {new_id[:8]}...)")
         return {"success": True, "task_id": new_id, "title": new_task["title"]}
     
-    def _update_task(self, task_tree: dict, task_data: dict) -> dict:
+    def _update_task(self, task_tree: dict, task_data: dict, now: str = None,
+                     index: Dict[str, tuple] = None) -> dict:
         """
         Update an existing task.
         
         Args:
             task_tree: The task tree to modify
             task_data: Data with task ID and fields to update
+            now: ISO timestamp for updated_at (defaults to the current time)
+            index: Task index from _index_tasks (optional)
             
         Returns:
             Result dictionary with success status
         """
-        from datetime import datetime
         
         task_id = task_data.get("id")
         if not task_id:
             return {"success": False, "error": "Task ID is required for update"}
         
-        task = self._find_task_by_id(task_tree, task_id)
+        task = self._lookup_task(task_tree, task_id, index)
         if task is None:
             return {"success": False, "error": f"Task not found: {task_id}"}
         
@@ -227,23 +310,23 @@ class TaskManager:
                 updated_fields.append(field)
         
         if updated_fields:
-            task["updated_at"] = datetime.now().isoformat()
+            task["updated_at"] = now or datetime.now().isoformat()
             
-            # Sync to database
-            self.db.create_or_update_task(task_data, task)
+            # The database row is refreshed when the tree is saved (save_task_tree syncs it)
             
             print(f"✓ 更新任务: {task['title']} (字段: {', '.join(updated_fields)})")
             return {"success": True, "task_id": task_id, "updated_fields": updated_fields}
         
         return {"success": True, "task_id": task_id, "updated_fields": []}
     
-    def _delete_task(self, task_tree: dict, task_id: str) -> dict:
+    def _delete_task(self, task_tree: dict, task_id: str, index: Dict[str, tuple] = None) -> dict:
         """
         Delete a task and its subtasks.
         
         Args:
             task_tree: The task tree to modify
             task_id: ID of the task to delete
+            index: Task index from _index_tasks, kept up to date (optional)
             
         Returns:
             Result dictionary with success status
@@ -255,31 +338,45 @@ class TaskManager:
             return {"success": False, "error": "Cannot delete root task"}
         
         # Find and remove the task
-        parent = self._find_parent_of_task(task_tree, task_id)
+        if index is not None:
+            parent = index[task_id][1] if task_id in index else None
+        else:
+            parent = self._find_parent_of_task(task_tree, task_id)
         if parent is None:
             return {"success": False, "error": f"Task not found: {task_id}"}
         
+        # Split the parent's children in one pass instead of searching the tree again
+        task_to_delete = None
+        remaining = []
+        for t in parent.get("subtasks", []):
+            if t.get("id") == task_id:
+                task_to_delete = t
+            else:
+                remaining.append(t)
+        
         # Collect all task IDs to delete (including subtasks)
-        task_to_delete = self._find_task_by_id(task_tree, task_id)
         ids_to_delete = self._collect_all_task_ids(task_to_delete)
         
         # Remove from parent's subtasks
-        parent["subtasks"] = [t for t in parent.get("subtasks", []) if t.get("id") != task_id]
+        parent["subtasks"] = remaining
         
         # Delete from database
-        for tid in ids_to_delete:
-            self.db.delete_task(tid)
+        self.db.delete_tasks(ids_to_delete)
+        if index is not None:
+            for tid in ids_to_delete:
+                index.pop(tid, None)
         
         print(f"✓ 删除任务: {task_to_delete.get('title', task_id)} (包含 {len(ids_to_delete)} 个任务)")
         return {"success": True, "task_id": task_id, "deleted_count": len(ids_to_delete)}
     
-    def _query_task(self, task_tree: dict, query_data: dict) -> dict:
+    def _query_task(self, task_tree: dict, query_data: dict, index: Dict[str, tuple] = None) -> dict:
         """
         Query and analyze tasks.
         
         Args:
             task_tree: The task tree to query from
             query_data: Query parameters (type, target_id, request)
+            index: Task index from _index_tasks (optional)
             
         Returns:
             Result dictionary with analysis report
@@ -289,7 +386,7 @@ class TaskManager:
         request = query_data.get("request", "")
         
         # Find target task
-        target = self._find_task_by_id(task_tree, target_id)
+        target = self._lookup_task(task_tree, target_id, index)
         if target is None:
             return {"success": False, "error": f"Task not found: {target_id}"}
         
@@ -345,6 +442,45 @@ class TaskManager:
         
         return tasks
     
+    def _index_tasks(self, node: dict, parent: dict = None, index: Dict[str, tuple] = None) -> Dict[str, tuple]:
+        """
+        Map every task ID in the tree to its node and parent in one walk.
+        
+        Args:
+            node: Node to index from
+            parent: Parent of node
+            index: Index being filled (created when omitted)
+            
+        Returns:
+            Dictionary of task ID -> (node, parent); the first occurrence wins,
+            matching _find_task_by_id
+        """
+        if index is None:
+            index = {}
+        task_id = node.get("id")
+        if task_id is not None:
+            index.setdefault(task_id, (node, parent))
+        for subtask in node.get("subtasks", []):
+            self._index_tasks(subtask, node, index)
+        return index
+    
+    def _lookup_task(self, task_tree: dict, task_id: str, index: Dict[str, tuple] = None) -> Optional[dict]:
+        """
+        Find a task by ID, through the index when one is given.
+        
+        Args:
+            task_tree: The task tree to search
+            task_id: ID to find
+            index: Task index from _index_tasks (optional)
+            
+        Returns:
+            The task node or None if not found
+        """
+        if index is None:
+            return self._find_task_by_id(task_tree, task_id)
+        entry = index.get(task_id)
+        return entry[0] if entry else None
+    
     def _find_task_by_id(self, node: dict, task_id: str) -> Optional[dict]:
         """
         Find a task by ID in the task tree.
@@ -426,9 +562,8 @@ class TaskManager:
         # Clear all tasks from database (except root)
         try:
             all_tasks = self.db.get_all_tasks()
-            for task in all_tasks:
-                if task['id'] != 'root':  # Don't delete the root task
-                    self.db.delete_task(task['id'])
+            # Don't delete the root task
+            self.db.delete_tasks([task['id'] for task in all_tasks if task['id'] != 'root'])
             print("✓ Database reset - all tasks cleared")
         except Exception as e:
             print(f"Warning: Could not reset database: {e}")
@@ -448,14 +583,20 @@ class TaskManager:
         """
         return self.db.get_task(task_id)
     
-    def get_all_tasks_metadata(self) -> list:
+    def get_all_tasks_metadata(self, status: Optional[str] = None, limit: Optional[int] = None,
+                               offset: int = 0) -> list:
         """
         Get all tasks metadata from database.
         
+        Args:
+            status: Only return tasks with this status (None for all)
+            limit: Maximum number of tasks to return (None for no limit)
+            offset: Number of tasks to skip
+            
         Returns:
             List of all task metadata
         """
-        return self.db.get_all_tasks()
+        return self.db.get_all_tasks(status=status, limit=limit, offset=offset)
     
     def update_task_metadata(self, task_id: str, metadata: Dict[str, Any]) -> bool:
         """
@@ -521,6 +662,9 @@ class TaskManager:
         if not task_id or task_id == "root":
             return True
         
+        if isinstance(task_id, str) and _CANONICAL_UUID_RE.fullmatch(task_id):
+            return True
+        
         try:
             uuid.UUID(task_id)
             return True
@@ -649,17 +793,9 @@ class TaskManager:
             id_mapping: Dictionary mapping old IDs to new UUIDs
         """
         try:
-            for old_id, new_id in id_mapping.items():
-                # Check if task with old ID exists in database
-                existing_task = self.db.get_task(old_id)
-                if existing_task:
-                    # Create new task with new UUID
-                    existing_task['id'] = new_id
-                    self.db.create_or_update_task(existing_task, {})
-                    
-                    # Delete the old task
-                    self.db.delete_task(old_id)
-                    
-                    print(f"✓ Updated task ID: {old_id} → {new_id}")
+            # Rename existing rows in place in one transaction; unknown IDs are skipped
+            renamed = self.db.rename_tasks(id_mapping)
+            for old_id, new_id in renamed.items():
+                print(f"✓ Updated task ID: {old_id} → {new_id}")
         except Exception as e:
             print(f"Error handling ID changes in database: {e}")
\ No newline at end of file
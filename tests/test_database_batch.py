@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for TaskDatabase batch operations, run against a temporary database.
+"""
+import os
+import tempfile
+
+from src.database import TaskDatabase
+
+
+def _make_tree():
+    """Build a small task tree with a nested subtask."""
+    return {
+        "id": "root",
+        "title": "Root Task",
+        "description": "Main project task",
+        "status": "pending",
+        "created_at": "2025-12-27T10:00:00",
+        "updated_at": "2025-12-27T10:00:00",
+        "subtasks": [
+            {
+                "id": "task-1",
+                "title": "Subtask 1",
+                "description": "First subtask",
+                "status": "pending",
+                "created_at": "2025-12-27T10:01:00",
+                "updated_at": "2025-12-27T10:01:00",
+                "subtasks": [
+                    {
+                        "id": "task-1-1",
+                        "title": "Nested subtask",
+                        "description": "",
+                        "status": "completed",
+                        "created_at": "2025-12-27T10:02:00",
+                        "updated_at": "2025-12-27T10:02:00",
+                        "subtasks": []
+                    }
+                ]
+            }
+        ]
+    }
+
+
+def test_sync_from_task_tree():
+    """Syncing a tree writes every node and updates existing rows in place."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = TaskDatabase(os.path.join(tmp_dir, "tasks.db"))
+        tree = _make_tree()
+        
+        assert database.sync_from_task_tree(tree)
+        assert {task["id"] for task in database.get_all_tasks()} == {"root", "task-1", "task-1-1"}
+        # New rows take their timestamps from the tree nodes
+        assert database.get_task("task-1-1")["created_at"] == "2025-12-27T10:02:00"
+        assert database.get_task("task-1-1")["updated_at"] == "2025-12-27T10:02:00"
+        
+        tree["subtasks"][0]["status"] = "completed"
+        assert database.sync_from_task_tree(tree)
+        assert database.get_task("task-1")["status"] == "completed"
+        assert database.get_task("task-1-1")["title"] == "Nested subtask"
+
+
+def test_relative_path_is_initialized_per_directory():
+    """The same relative path in another working directory gets its own schema."""
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as first_dir, tempfile.TemporaryDirectory() as second_dir:
+        try:
+            os.chdir(first_dir)
+            TaskDatabase("tasks.db")
+            
+            os.chdir(second_dir)
+            open("tasks.db", "wb").close()  # Exists, but has no schema yet
+            database = TaskDatabase("tasks.db")
+            assert database.sync_from_task_tree(_make_tree())
+            assert len(database.get_all_tasks()) == 3
+        finally:
+            os.chdir(original_cwd)
+
+
+def test_get_all_tasks_filters_and_pages():
+    """Status filtering and LIMIT/OFFSET run in SQL, newest task first."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = TaskDatabase(os.path.join(tmp_dir, "tasks.db"))
+        assert database.sync_from_task_tree(_make_tree())
+        
+        def ids(**kwargs):
+            return [task["id"] for task in database.get_all_tasks(**kwargs)]
+        
+        assert ids() == ["task-1-1", "task-1", "root"]
+        assert ids(status="pending") == ["task-1", "root"]
+        assert ids(limit=1, offset=1) == ["task-1"]
+        assert ids(offset=2) == ["root"]
+        assert ids(status="pending", limit=1, offset=1) == ["root"]
+        assert ids(limit=0) == []
+
+
+def test_delete_tasks():
+    """Bulk delete removes only the given IDs."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = TaskDatabase(os.path.join(tmp_dir, "tasks.db"))
+        assert database.sync_from_task_tree(_make_tree())
+        
+        assert database.delete_tasks(["task-1", "task-1-1", "missing"])
+        assert [task["id"] for task in database.get_all_tasks()] == ["root"]
+        assert database.delete_tasks([])
+
+
+def test_rename_tasks():
+    """Renaming keeps the row's data and reports only IDs that existed."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database = TaskDatabase(os.path.join(tmp_dir, "tasks.db"))
+        assert database.sync_from_task_tree(_make_tree())
+        
+        renamed = database.rename_tasks({"task-1": "task-a", "missing": "task-b"})
+        assert renamed == {"task-1": "task-a"}
+        assert database.get_task("task-1") is None
+        assert database.get_task("task-a")["title"] == "Subtask 1"
+
+
+if __name__ == "__main__":
+    test_sync_from_task_tree()
+    test_relative_path_is_initialized_per_directory()
+    test_get_all_tasks_filters_and_pages()
+    test_delete_tasks()
+    test_rename_tasks()
+    print("✓ Database batch tests passed")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the LLM client helpers that run without calling the LLM.
+"""
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from langchain_core.prompts import PromptTemplate
+
+from src.config import config
+from src.llm_client import _JsonObjectScanner, _prune_analysis_cache, _read_cached_analysis
+
+
+def _feed_all(chunks):
+    """Feed chunks to a fresh scanner and collect its result after each one."""
+    scanner = _JsonObjectScanner()
+    return [scanner.feed(chunk) for chunk in chunks]
+
+
+def test_prune_analysis_cache():
+    """Pruning keeps the most recently used reports and deletes the rest."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = Path(tmp_dir)
+        for age, name in enumerate(("newest", "middle", "oldest")):
+            path = cache_dir / f"{name}.md"
+            path.write_text(name, encoding="utf-8")
+            mtime = 1_700_000_000 - age * 60
+            os.utime(path, (mtime, mtime))
+        
+        _prune_analysis_cache(cache_dir, 2)
+        assert sorted(path.stem for path in cache_dir.glob("*.md")) == ["middle", "newest"]
+        
+        _prune_analysis_cache(cache_dir, 2)
+        assert len(list(cache_dir.glob("*.md"))) == 2
+
+
+def test_read_cached_analysis_on_read_only_filesystem():
+    """A report that was read is returned even when its mtime cannot be bumped."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "report.md"
+        path.write_text("## Report", encoding="utf-8")
+        with mock.patch("src.llm_client.os.utime", side_effect=PermissionError):
+            assert _read_cached_analysis(path) == "## Report"
+        assert _read_cached_analysis(Path(tmp_dir) / "missing.md") is None
+
+
+def test_scanner_ignores_braces_in_strings():
+    """A closing brace inside a string value does not end the object."""
+    assert _feed_all(['{"title": "a}b', '"}']) == [False, True]
+
+
+def test_scanner_handles_escapes():
+    """Escaped quotes stay inside the string; an escaped backslash does not escape the quote."""
+    assert _feed_all(['{"title": "say \\"}\\" now"', '}']) == [False, True]
+    assert _feed_all(['{"path": "C:\\\\"', '}']) == [False, True]
+
+
+def test_scanner_skips_prose_before_json():
+    """Quotes and closing braces in text before the object are ignored."""
+    assert _feed_all(['Here is the "plan" } you asked for:\n', '{"operations": []}']) == [False, True]
+
+
+def test_scanner_handles_code_fence():
+    """The object inside a ```json fence ends at its own closing brace, not a nested one."""
+    assert _feed_all(['```json\n{"a": {"b": 1}', '}', '\n```']) == [False, True, False]
+
+
+def test_scanner_handles_tokens_split_across_chunks():
+    """An escape sequence split between chunks is still honoured."""
+    assert _feed_all(['{"title": "x\\', '"}', '"', '}']) == [False, False, False, True]
+
+
+def test_render_task_prompt_matches_prompt_template():
+    """The pre-split template renders exactly what PromptTemplate.format would."""
+    tree = '{"id": "root", "subtasks": [{"title": "{nested} {{braces}}"}]}'
+    user_input = "add {placeholder} and }{ stray braces"
+    template = PromptTemplate(
+        template=config.TASK_PROMPT_TEMPLATE,
+        input_variables=["current_task_tree", "user_input"]
+    )
+    expected = template.format(current_task_tree=tree, user_input=user_input)
+    assert config.render_task_prompt(tree, user_input) == expected
+
+
+if __name__ == "__main__":
+    test_prune_analysis_cache()
+    test_read_cached_analysis_on_read_only_filesystem()
+    test_scanner_ignores_braces_in_strings()
+    test_scanner_handles_escapes()
+    test_scanner_skips_prose_before_json()
+    test_scanner_handles_code_fence()
+    test_scanner_handles_tokens_split_across_chunks()
+    test_render_task_prompt_matches_prompt_template()
+    print("✓ LLM client helper tests passed")
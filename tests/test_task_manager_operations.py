@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Tests for TaskManager operation batches, run against a temporary tree and database.
+"""
+import os
+import tempfile
+import uuid
+from unittest import mock
+
+from src.database import TaskDatabase
+from src.task_manager import TaskManager
+
+
+NEW_TASK_ID = "00000000-0000-4000-8000-000000000001"
+
+
+def _make_tree():
+    """Build a tree with a parent that has a child, next to an unrelated task."""
+    return {
+        "id": "root",
+        "title": "Root Task",
+        "description": "Main project task",
+        "status": "pending",
+        "created_at": "2025-12-27T10:00:00",
+        "updated_at": "2025-12-27T10:00:00",
+        "subtasks": [
+            {
+                "id": "parent",
+                "title": "Parent",
+                "description": "",
+                "status": "pending",
+                "created_at": "2025-12-27T10:01:00",
+                "updated_at": "2025-12-27T10:01:00",
+                "subtasks": [
+                    {
+                        "id": "child",
+                        "title": "Child",
+                        "description": "",
+                        "status": "pending",
+                        "created_at": "2025-12-27T10:02:00",
+                        "updated_at": "2025-12-27T10:02:00",
+                        "subtasks": []
+                    }
+                ]
+            },
+            {
+                "id": "other",
+                "title": "Other",
+                "description": "",
+                "status": "pending",
+                "created_at": "2025-12-27T10:03:00",
+                "updated_at": "2025-12-27T10:03:00",
+                "subtasks": []
+            }
+        ]
+    }
+
+
+class FakeLLMClient:
+    """Stands in for LLMClient, returning queued operation batches without any network call."""
+    
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.calls = 0
+    
+    def process_task_input(self, current_task_tree, user_input):
+        self.calls += 1
+        return {"operations": self.batches.pop(0), "message": "ok"}
+    
+    def generate_analysis(self, tasks_data, query_request, query_type):
+        return "## Report"
+
+
+def _make_manager(tmp_dir):
+    """Build a TaskManager whose tree file and database live in tmp_dir."""
+    database = TaskDatabase(os.path.join(tmp_dir, "tasks.db"))
+    with mock.patch("src.task_manager.TaskDatabase", return_value=database):
+        task_manager = TaskManager()
+    task_manager.task_tree_file = os.path.join(tmp_dir, "task_tree.json")
+    task_manager.save_task_tree(_make_tree())
+    return task_manager
+
+
+def test_apply_operations_batch():
+    """Operations in one batch see the additions and deletions made before them."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        task_manager = _make_manager(tmp_dir)
+        tree = task_manager.load_task_tree()
+        operations = [
+            {"operation": "add", "parent_id": "other", "task": {"title": "New"}},
+            {"operation": "update", "task": {"id": NEW_TASK_ID, "status": "completed"}},
+            {"operation": "delete", "task": {"id": "parent"}},
+            {"operation": "update", "task": {"id": "child", "title": "Renamed"}},
+        ]
+        
+        with mock.patch("src.task_manager.uuid.uuid4", return_value=uuid.UUID(NEW_TASK_ID)):
+            results = task_manager.apply_operations(tree, operations)
+        
+        assert results[0] == {"operation": "add", "success": True, "task_id": NEW_TASK_ID, "title": "New"}
+        assert results[1] == {"operation": "update", "success": True, "task_id": NEW_TASK_ID,
+                              "updated_fields": ["status"]}
+        assert results[2] == {"operation": "delete", "success": True, "task_id": "parent", "deleted_count": 2}
+        assert results[3] == {"operation": "update", "success": False, "error": "Task not found: child"}
+        
+        assert [task["id"] for task in tree["subtasks"]] == ["other"]
+        new_task = tree["subtasks"][0]["subtasks"][0]
+        assert (new_task["id"], new_task["title"], new_task["status"]) == (NEW_TASK_ID, "New", "completed")
+        assert new_task["subtasks"] == []
+        assert task_manager.db.get_task("parent") is None
+        assert task_manager.db.get_task("child") is None
+
+
+def test_process_user_input_saves_only_on_change():
+    """Batches that change nothing leave task_tree.json alone; each real change writes it."""
+    unchanged_batches = [
+        [{"operation": "query", "query": {"target_id": "root", "request": "summary"}}],
+        [{"operation": "update", "task": {"id": "missing", "title": "X"}},
+         {"operation": "delete", "task": {"id": "root"}}],
+        [{"operation": "update", "task": {"id": "child"}}],
+    ]
+    changing_batches = [
+        [{"operation": "add", "parent_id": "root", "task": {"title": "New"}}],
+        [{"operation": "update", "task": {"id": "child", "status": "completed"}}],
+        [{"operation": "delete", "task": {"id": "other"}}],
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        task_manager = _make_manager(tmp_dir)
+        llm_client = FakeLLMClient(unchanged_batches + changing_batches)
+        task_manager.llm_client = llm_client
+        with open(task_manager.task_tree_file, "rb") as f:
+            original = f.read()
+        
+        with mock.patch.object(task_manager, "save_task_tree", wraps=task_manager.save_task_tree) as save:
+            # Blank input never reaches the LLM
+            result = task_manager.process_user_input("   ")
+            assert result["operations_applied"] == []
+            assert llm_client.calls == 0
+            
+            for _ in unchanged_batches:
+                task_manager.process_user_input("change nothing")
+            assert save.call_count == 0
+            with open(task_manager.task_tree_file, "rb") as f:
+                assert f.read() == original
+            
+            for expected_saves, _ in enumerate(changing_batches, start=1):
+                result = task_manager.process_user_input("change something")
+                assert result["operations_applied"][0]["success"]
+                assert save.call_count == expected_saves
+        
+        assert llm_client.calls == len(unchanged_batches) + len(changing_batches)
+        tree = task_manager.load_task_tree()
+        assert [task["title"] for task in tree["subtasks"]] == ["Parent", "New"]
+        assert tree["subtasks"][0]["subtasks"][0]["status"] == "completed"
+
+
+if __name__ == "__main__":
+    test_apply_operations_batch()
+    test_process_user_input_saves_only_on_change()
+    print("✓ Task manager operation tests passed")
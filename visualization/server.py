@@ -4,15 +4,18 @@ FastAPI server for task visualization.
 Provides read-only endpoints to inspect task tree and database.
 """
 
-import json
+import asyncio
+import functools
 import os
 import sys
 import logging
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
@@ -30,6 +33,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.task_manager import TaskManager
 from src.database import TaskDatabase
+from src.json_utils import dumps_bytes, loads, write_atomic
 
 app = FastAPI(title="Task Visualization Server", version="1.0.0")
 
@@ -39,14 +43,37 @@ data_dir = Path(__file__).parent.parent / "data"
 task_tree_file = data_dir / "task_tree.json"
 chat_history_file = data_dir / "chat_history.json"
 database = TaskDatabase(db_path=str(data_dir / "tasks.db"))
-task_manager = TaskManager()  # Initialize TaskManager for chat functionality
+
+
+@functools.lru_cache(maxsize=1)
+def get_task_manager() -> TaskManager:
+    """Create the TaskManager (and its LLM client) on first use by chat/reset."""
+    return TaskManager()
+
+
+# Chat and reset mutate the task tree from a worker thread; run them one at a time
+_task_tree_lock = asyncio.Lock()
+
+
+# ((mtime_ns, size, inode), tree) of the last successful read of task_tree_file
+_task_tree_cache = None
+
 
 def load_task_tree_local():
-    """Load task tree directly from JSON file."""
+    """Load task tree directly from JSON file, reusing the last parse while the file is unchanged."""
+    global _task_tree_cache
     try:
-        if task_tree_file.exists():
-            with open(task_tree_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+        # stat() doubles as the existence check
+        stat = task_tree_file.stat()
+        # Atomic saves replace the file, so the inode changes even within one mtime tick
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if _task_tree_cache is not None and _task_tree_cache[0] == signature:
+            return _task_tree_cache[1]
+        with open(task_tree_file, "rb") as f:
+            tree = loads(f.read())
+        _task_tree_cache = (signature, tree)
+        return tree
+    except FileNotFoundError:
         return {"subtasks": []} # Fallback
     except Exception as e:
         logger.error(f"Error loading task tree: {e}")
@@ -111,24 +138,21 @@ async def get_task_tree():
     try:
         tree = load_task_tree_local()
         
-        # Calculate tree statistics
-        def count_tasks(node: Dict[str, Any]) -> int:
+        # Calculate tree statistics (task count and depth) in a single walk
+        def tree_stats(node: Dict[str, Any], current_depth: int = 0) -> Tuple[int, int]:
             count = 1
-            for subtask in node.get("subtasks", []):
-                count += count_tasks(subtask)
-            return count
-        
-        def max_depth(node: Dict[str, Any], current_depth: int = 0) -> int:
             max_subtask_depth = current_depth
             for subtask in node.get("subtasks", []):
-                subtask_depth = max_depth(subtask, current_depth + 1)
+                subtask_count, subtask_depth = tree_stats(subtask, current_depth + 1)
+                count += subtask_count
                 max_subtask_depth = max(max_subtask_depth, subtask_depth)
-            return max_subtask_depth
+            return count, max_subtask_depth
         
+        total_tasks, max_depth = tree_stats(tree)
         return TaskTreeResponse(
             tree=tree,
-            total_tasks=count_tasks(tree),
-            max_depth=max_depth(tree)
+            total_tasks=total_tasks,
+            max_depth=max_depth
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading task tree: {str(e)}")
@@ -139,11 +163,8 @@ async def get_all_tasks():
     try:
         tasks = database.get_all_tasks()
         
-        # Calculate status breakdown
-        status_breakdown = {}
-        for task in tasks:
-            status = task.get("status", "unknown")
-            status_breakdown[status] = status_breakdown.get(status, 0) + 1
+        # Count from the rows already fetched so the breakdown matches `tasks`
+        status_breakdown = dict(Counter(task.get("status") or "unknown" for task in tasks))
         
         return TaskListResponse(
             tasks=tasks,
@@ -213,7 +234,11 @@ async def chat_with_llm(request: ChatRequest):
         
         # Process user input through TaskManager
         # Now returns dict with tree, operations_applied, message
-        result = task_manager.process_user_input(request.message)
+        # The LLM round-trip blocks, so run it in the threadpool to keep the event loop serving reads
+        async with _task_tree_lock:
+            result = await run_in_threadpool(
+                lambda: get_task_manager().process_user_input(request.message)
+            )
         
         # Get updated task list from database
         tasks = database.get_all_tasks()
@@ -277,7 +302,8 @@ async def reset_task_tree():
     """Reset the task tree and database to initial state."""
     try:
         # Reset task tree using TaskManager
-        reset_tree = task_manager.reset_task_tree()
+        async with _task_tree_lock:
+            reset_tree = await run_in_threadpool(lambda: get_task_manager().reset_task_tree())
         logger.info("Task tree reset successfully")
         
         return {
@@ -331,9 +357,9 @@ async def get_chat_history():
     """Get chat history from file."""
     try:
         if chat_history_file.exists():
-            with open(chat_history_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return ChatHistoryResponse(messages=data.get("messages", []))
+            with open(chat_history_file, "rb") as f:
+                data = loads(f.read())
+            return ChatHistoryResponse(messages=data.get("messages", []))
         return ChatHistoryResponse(messages=[])
     except Exception as e:
         logger.error(f"Error loading chat history: {e}")
@@ -346,11 +372,10 @@ async def save_chat_history(request: ChatHistoryRequest):
         # Ensure data directory exists
         chat_history_file.parent.mkdir(parents=True, exist_ok=True)
         
-        # Save to file
-        with open(chat_history_file, "w", encoding="utf-8") as f:
-            json.dump({
-                "messages": [msg.dict() for msg in request.messages]
-            }, f, ensure_ascii=False, indent=2)
+        # Save to file atomically so a crash mid-write cannot truncate the history
+        write_atomic(chat_history_file, dumps_bytes({
+            "messages": [msg.dict() for msg in request.messages]
+        }, indent=True))
         
         return {"success": True, "message": "Chat history saved"}
     except Exception as e: